@@ -0,0 +1,17 @@
+import sys
+import types
+from datetime import datetime
+
+try:
+    import functions  # noqa: F401
+except ImportError:
+    # functions.py is kept out of the repository; provide the helper main.py imports
+    functions = types.ModuleType("functions")
+
+    def convert_iso_timezone(value, tz):
+        if value is None:
+            return None
+        return datetime.fromisoformat(value).astimezone(tz).isoformat()
+
+    functions.convert_iso_timezone = convert_iso_timezone
+    sys.modules["functions"] = functions
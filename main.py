@@ -1,12 +1,24 @@
+import asyncio
+import functools
+import json
+import logging
 import os
-import pickle
+import re
+import threading
+import time as time_module
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone, time
 
-import pytz
+import httplib2
 from caldav import DAVClient
+from caldav.elements import dav
+from caldav.lib.error import DAVError
 from icalendar import Calendar, Event
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from pydantic_settings import BaseSettings
@@ -14,6 +26,8 @@ from pydantic_settings import BaseSettings
 # Import your helper function (make sure it’s defined in functions.py)
 from functions import convert_iso_timezone
 
+logger = logging.getLogger(__name__)
+
 
 # -------------------------------
 # Configuration using Pydantic
@@ -23,82 +37,308 @@ class Config(BaseSettings):
     yandex_username: str
     yandex_password: str
     yandex_calname: str
+    # Number of concurrent CalDAV uploads when adding events to Yandex
+    yandex_max_workers: int = 8
+    # Discovered calendar URLs are cached on disk to skip PROPFIND requests on warm starts
+    yandex_calendar_cache: str = "~/.cache/calendarsyncbridge/calendars.json"
+    yandex_calendar_cache_ttl: int = 3600
 
     # Google credentials and settings
     google_credentials_file: str = "credentials.json"
-    google_token_file: str = "token.pickle"
+    google_token_file: str = "token.json"
     google_scopes: list[str] = ["https://www.googleapis.com/auth/calendar"]
     google_calname: str = "primary"
+    google_http_cache: str = "~/.cache/calendarsyncbridge/http"
 
     # Time window settings for events
     past_days: int = 7
     future_days: int = 30
 
+    # Sync tokens and event snapshots used to fetch only changes on subsequent runs
+    sync_state_file: str = "~/.cache/calendarsyncbridge/tokens.json"
+
     class Config:
         # You can set your environment file here
         env_file = ".env"
 
 
+YANDEX_CALDAV_URL = "https://caldav.yandex.ru"
+
+# Google batch requests accept at most 50 calls per multipart/mixed POST
+GOOGLE_BATCH_SIZE = 50
+GOOGLE_BATCH_RETRIES = 3
+# 403 reasons returned by Google for quota errors that succeed when retried later
+GOOGLE_RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+# Largest page size accepted by events().list
+GOOGLE_PAGE_SIZE = 2500
+
+# Components extracted from CalDAV payloads before parsing them as one calendar
+VTIMEZONE_PATTERN = re.compile(r"^BEGIN:VTIMEZONE\r?\n.*?^END:VTIMEZONE(?=\r?$)", re.M | re.S)
+VEVENT_PATTERN = re.compile(r"^BEGIN:VEVENT\r?\n.*?^END:VEVENT(?=\r?$)", re.M | re.S)
+TZID_PATTERN = re.compile(r"^TZID:([^\r\n]*)", re.M)
+# Property added to merged VEVENTs to remember which CalDAV object they came from
+HREF_PROPERTY = "X-CALENDARSYNC-HREF"
+# Prefix of tokens caldav makes up when it emulates sync-collection with a full download
+CALDAV_FAKE_TOKEN_PREFIX = "fake-"
+
+
+# Calendar name-to-URL maps discovered in this process, keyed by Yandex username
+_calendar_urls_by_user: dict[str, dict[str, str]] = {}
+
+
+def _to_utc(dt: datetime) -> datetime:
+    """Return the datetime in UTC, skipping the conversion when it already is."""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    if dt.tzinfo is timezone.utc:
+        return dt
+    if dt.utcoffset() == timedelta(0):
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _is_transient_google_error(exception: Exception) -> bool:
+    """Check whether a failed Google request is worth retrying."""
+    if not isinstance(exception, HttpError):
+        return False
+    status = exception.resp.status
+    if status == 429 or status >= 500:
+        return True
+    if status == 403 and isinstance(exception.error_details, list):
+        return any(
+            detail.get("reason") in GOOGLE_RATE_LIMIT_REASONS for detail in exception.error_details
+        )
+    return False
+
+
+def _load_sync_state(path: str) -> dict:
+    """Load the incremental sync state saved by the previous run."""
+    try:
+        with open(path, "r", encoding="utf-8") as state_file:
+            return json.load(state_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_sync_state(path: str, state: dict):
+    """Persist the incremental sync state, leaving out in-memory only event fields."""
+    serializable = {}
+    for side, side_state in state.items():
+        events = {
+            ref: [{k: v for k, v in event.items() if not k.startswith("_")} for event in ref_events]
+            for ref, ref_events in side_state.get("events", {}).items()
+        }
+        serializable[side] = {**side_state, "events": events}
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as state_file:
+            json.dump(serializable, state_file)
+    except OSError as error:
+        # Losing the state only costs a full fetch next run, so keep syncing
+        logger.warning("Could not write sync state %s: %s", path, error)
+
+
+def _state_covers(state: dict, start: datetime, end: datetime) -> bool:
+    """Check whether the saved snapshot has a sync token and spans the requested range."""
+    return bool(
+        state.get("sync_token")
+        and datetime.fromisoformat(state["start"]) <= start
+        and datetime.fromisoformat(state["end"]) >= end
+    )
+
+
+def _event_start(event_data: dict) -> datetime:
+    """Return the event start, reusing the parsed value when collection kept one."""
+    return event_data.get("_start_dt") or datetime.fromisoformat(event_data["start"])
+
+
+def _events_in_window(snapshot: dict, start: datetime, end: datetime) -> dict:
+    """Key the snapshot events by (name, start_time), keeping those overlapping the range."""
+    events_data = {}
+    for ref_events in snapshot.values():
+        for event_data in ref_events:
+            if event_data["start"] and event_data["end"]:
+                if _event_start(event_data) > end or datetime.fromisoformat(event_data["end"]) < start:
+                    continue
+            events_data[(event_data["name"], event_data["start"])] = event_data
+    return events_data
+
+
+def _format_event_keys(event_keys) -> str:
+    """Render (name, start_time) event keys as readable "name/start_time" entries."""
+    return ", ".join(f"{name}/{start}" for name, start in event_keys)
+
+
 # -------------------------------
 # Yandex Calendar Client (using caldav)
 # -------------------------------
 class YandexCalendarClient:
     def __init__(self, config: Config):
         self.config = config
-        self.utc_tz = pytz.utc
+        self.utc_tz = timezone.utc
         # Connect to Yandex Calendar using DAVClient
-        self.client = DAVClient(
-            url="https://caldav.yandex.ru",
-            username=config.yandex_username,
-            password=config.yandex_password,
-        )
-        self.principal = self.client.principal()
+        self.client = self._new_client()
+        self.calendar_cache_file = os.path.expanduser(config.yandex_calendar_cache)
         self.calendar = self._get_calendar_by_name(config.yandex_calname)
+        # Per-thread connections used by add_event when inserting concurrently
+        self._local = threading.local()
+        # VCALENDAR envelope shared by every event uploaded through add_event
+        self._ics_prefix = b"BEGIN:VCALENDAR\r\nPRODID:CalendarSyncApp\r\nVERSION:2.0\r\n"
+        self._ics_suffix = b"END:VCALENDAR\r\n"
+
+    def _new_client(self) -> DAVClient:
+        """Create a DAVClient connected to Yandex Calendar."""
+        return DAVClient(
+            url=YANDEX_CALDAV_URL,
+            username=self.config.yandex_username,
+            password=self.config.yandex_password,
+        )
+
+    def _thread_calendar(self):
+        """Return the target calendar bound to a DAVClient owned by the current thread."""
+        # The underlying requests session is not guaranteed to be thread-safe
+        calendar = getattr(self._local, "calendar", None)
+        if calendar is None:
+            calendar = self._new_client().calendar(url=self.calendar.url)
+            self._local.calendar = calendar
+        return calendar
+
+    def _load_cached_calendar_url(self, cache_key: str):
+        """Return the calendar URL stored on disk if it is still fresh."""
+        try:
+            with open(self.calendar_cache_file, "r", encoding="utf-8") as cache:
+                entry = json.load(cache).get(cache_key)
+        except (OSError, ValueError):
+            return None
+        if entry and time_module.time() - entry["timestamp"] < self.config.yandex_calendar_cache_ttl:
+            return entry["url"]
+        return None
+
+    def _store_cached_calendar_url(self, cache_key: str, url: str):
+        """Persist the discovered calendar URL for subsequent runs."""
+        try:
+            with open(self.calendar_cache_file, "r", encoding="utf-8") as cache:
+                entries = json.load(cache)
+        except (OSError, ValueError):
+            entries = {}
+        entries[cache_key] = {"url": url, "timestamp": time_module.time()}
+        try:
+            os.makedirs(os.path.dirname(self.calendar_cache_file) or ".", exist_ok=True)
+            with open(self.calendar_cache_file, "w", encoding="utf-8") as cache:
+                json.dump(entries, cache)
+        except OSError as error:
+            # The cache only saves round trips, so failing to write it is not fatal
+            logger.warning("Could not write calendar cache %s: %s", self.calendar_cache_file, error)
+
+    def _discover_calendar_urls(self) -> dict[str, str]:
+        """Map calendar names to URLs for the account, once per process."""
+        username = self.config.yandex_username
+        if username not in _calendar_urls_by_user:
+            _calendar_urls_by_user[username] = {
+                cal.name: str(cal.url) for cal in self.client.principal().calendars()
+            }
+        return _calendar_urls_by_user[username]
 
     def _get_calendar_by_name(self, cal_name: str):
         """Retrieve the calendar with the specified name."""
-        calendars = self.principal.calendars()
-        for cal in calendars:
-            if cal.name == cal_name:
-                return cal
-        raise ValueError(f"Calendar named {cal_name} not found.")
-
-    def get_events(self, start: datetime, end: datetime) -> dict:
-        """Retrieve events from the Yandex calendar within the specified time range."""
-        events_data = {}
-        events = self.calendar.search(start=start, end=end)
-        for event in events:
-            ics_data = event.data
-            cal = Calendar.from_ical(ics_data)
-            for component in cal.walk("VEVENT"):
-                name = component.get("summary").encode("utf-8").decode("utf-8")
-                desc = component.get("description", "").encode("utf-8").decode("utf-8")
-                dtstart = component.get("dtstart").dt
-                dtend = component.get("dtend").dt
-                # Ensure datetime objects are in UTC
-                if dtstart.tzinfo is None:
-                    dtstart = dtstart.replace(tzinfo=timezone.utc)
-                else:
-                    dtstart = dtstart.astimezone(timezone.utc)
-                if dtend.tzinfo is None:
-                    dtend = dtend.replace(tzinfo=timezone.utc)
-                else:
-                    dtend = dtend.astimezone(timezone.utc)
-                start_iso = dtstart.isoformat()
-                events_data[f"{name}/{start_iso}"] = {
+        cache_key = f"{self.config.yandex_username}/{cal_name}"
+        url = self._load_cached_calendar_url(cache_key)
+        if url is None:
+            calendar_urls = self._discover_calendar_urls()
+            if cal_name not in calendar_urls:
+                raise ValueError(f"Calendar named {cal_name} not found.")
+            url = calendar_urls[cal_name]
+            self._store_cached_calendar_url(cache_key, url)
+        return self.client.calendar(url=url)
+
+    @staticmethod
+    def _merge_ics(objects) -> str:
+        """Combine (href, ics_data) objects into one VCALENDAR, keeping each VTIMEZONE only once."""
+        timezones = {}
+        vevents = []
+        for href, ics_data in objects:
+            for block in VTIMEZONE_PATTERN.findall(ics_data):
+                tzid = TZID_PATTERN.search(block)
+                timezones.setdefault(tzid.group(1) if tzid else block, block)
+            for block in VEVENT_PATTERN.findall(ics_data):
+                vevents.append(block.replace("\n", f"\n{HREF_PROPERTY}:{href}\r\n", 1))
+        return "\r\n".join(["BEGIN:VCALENDAR", *timezones.values(), *vevents, "END:VCALENDAR", ""])
+
+    def _parse_events(self, objects: list) -> dict:
+        """Parse (href, ics_data) objects into event data grouped by object href."""
+        snapshot = {}
+        if not objects:
+            return snapshot
+        # Parse all events in a single pass instead of one VCALENDAR (and its VTIMEZONEs) each
+        cal = Calendar.from_ical(self._merge_ics(objects))
+        for component in cal.walk("VEVENT"):
+            name = str(component.get("summary"))
+            desc = str(component.get("description", ""))
+            # Ensure datetime objects are in UTC
+            dtstart = _to_utc(component.get("dtstart").dt)
+            dtend = _to_utc(component.get("dtend").dt)
+            snapshot.setdefault(str(component.get(HREF_PROPERTY)), []).append(
+                {
                     "name": name,
                     "description": desc,
-                    "start": start_iso,
+                    "start": dtstart.isoformat(),
                     "end": dtend.isoformat(),
+                    # Parsed start kept alongside the ISO string to avoid re-parsing it later
+                    "_start_dt": dtstart,
                 }
-        return events_data
+            )
+        return snapshot
+
+    @staticmethod
+    def _real_sync_token(sync_token):
+        """Return the token only if the server issued it, treating caldav's emulated ones as none."""
+        if sync_token is None or str(sync_token).startswith(CALDAV_FAKE_TOKEN_PREFIX):
+            return None
+        return str(sync_token)
+
+    def get_events(self, start: datetime, end: datetime, state: dict) -> dict:
+        """Retrieve events from the Yandex calendar within the specified time range.
+
+        ``state`` holds the sync token and events from the previous run; when it covers
+        the range, only objects changed since then are downloaded.
+        """
+        # Emulated tokens saved by older runs would make caldav download everything again
+        if _state_covers(state, start, end) and self._real_sync_token(state["sync_token"]):
+            try:
+                # Without disable_fallback caldav answers a rejected token with an unbounded search
+                changes = self.calendar.get_objects_by_sync_token(
+                    sync_token=state["sync_token"], load_objects=True, disable_fallback=True
+                )
+            except DAVError:
+                # The server rejected the token, so fall back to a full fetch
+                pass
+            else:
+                snapshot = state["events"]
+                changed = []
+                for obj in changes:
+                    # Replace changed objects; those that could not be loaded were deleted
+                    snapshot.pop(str(obj.url), None)
+                    if obj.data is not None:
+                        changed.append((str(obj.url), obj.data))
+                snapshot.update(self._parse_events(changed))
+                state["sync_token"] = self._real_sync_token(changes.sync_token)
+                return _events_in_window(snapshot, start, end)
+
+        # Read the token before searching so changes made during the fetch are seen next run
+        sync_token = self.calendar.get_property(dav.SyncToken())
+        # Restrict the REPORT to VEVENTs so the time-range filter is applied server-side
+        events = self.calendar.search(start=start, end=end, event=True, expand=False)
+        state.clear()
+        state.update(
+            sync_token=self._real_sync_token(sync_token),
+            start=start.isoformat(),
+            end=end.isoformat(),
+            events=self._parse_events([(str(event.url), event.data) for event in events]),
+        )
+        return _events_in_window(state["events"], start, end)
 
     def add_event(self, event_data: dict):
         """Add an event to the Yandex calendar."""
-        cal = Calendar()
-        cal.add("prodid", "CalendarSyncApp")
-        cal.add("version", "2.0")
-
         ical_event = Event()
         ical_event.add("uid", str(uuid.uuid4()))
         ical_event.add("summary", event_data["name"])
@@ -106,9 +346,15 @@ class YandexCalendarClient:
         ical_event.add("dtstart", datetime.fromisoformat(event_data["start"]))
         ical_event.add("dtend", datetime.fromisoformat(event_data["end"]))
 
-        cal.add_component(ical_event)
-        ics_data = cal.to_ical().decode("utf-8")
-        self.calendar.add_event(ics_data)
+        # Only the VEVENT changes between calls, so wrap it in the prebuilt envelope
+        ics_data = (self._ics_prefix + ical_event.to_ical() + self._ics_suffix).decode("utf-8")
+        self._thread_calendar().add_event(ics_data)
+
+    def add_events(self, events: list[dict]):
+        """Add events to the Yandex calendar using a bounded pool of concurrent uploads."""
+        # CalDAV has no batch endpoint, so overlap the per-event PUT requests instead
+        with ThreadPoolExecutor(max_workers=self.config.yandex_max_workers) as executor:
+            list(executor.map(self.add_event, events))
 
 
 # -------------------------------
@@ -117,6 +363,8 @@ class YandexCalendarClient:
 class GoogleCalendarClient:
     def __init__(self, config: Config):
         self.config = config
+        # Cached responses contain event details, so keep them with the other per-user caches
+        self.http_cache_dir = os.path.expanduser(config.google_http_cache)
         self.service = self._authenticate()
 
     def _authenticate(self):
@@ -124,8 +372,7 @@ class GoogleCalendarClient:
         creds = None
         token_file = self.config.google_token_file
         if os.path.exists(token_file):
-            with open(token_file, "rb") as token:
-                creds = pickle.load(token)
+            creds = Credentials.from_authorized_user_file(token_file, self.config.google_scopes)
         # If there are no (valid) credentials available, let the user log in.
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
@@ -135,52 +382,141 @@ class GoogleCalendarClient:
                     self.config.google_credentials_file, self.config.google_scopes
                 )
                 creds = flow.run_local_server(port=0)
-            with open(token_file, "wb") as token:
-                pickle.dump(creds, token)
-        return build("calendar", "v3", credentials=creds)
-
-    def get_events(self, start: datetime, end: datetime) -> dict:
-        """Retrieve events from the Google calendar within the specified time range."""
-        events_data = {}
-        events_result = self.service.events().list(
-            calendarId=self.config.google_calname,
+            with open(token_file, "w", encoding="utf-8") as token:
+                token.write(creds.to_json())
+        # Reuse one keep-alive connection for every request made by the service
+        http = AuthorizedHttp(creds, http=httplib2.Http(cache=self.http_cache_dir))
+        # Use the discovery document bundled with the client library instead of fetching it
+        return build("calendar", "v3", http=http, static_discovery=True)
+
+    def _list_events(self, **params) -> tuple[list, str]:
+        """Fetch every page of events().list, returning the items and the next sync token."""
+        events = []
+        page_token = None
+        while True:
+            events_result = self.service.events().list(
+                calendarId=self.config.google_calname,
+                singleEvents=True,
+                maxResults=GOOGLE_PAGE_SIZE,
+                pageToken=page_token,
+                # Only request the fields used by _to_event_data and paging to keep responses small
+                fields=(
+                    "items(id,status,summary,description,start/dateTime,end/dateTime),"
+                    "nextPageToken,nextSyncToken"
+                ),
+                **params,
+            ).execute()
+            events.extend(events_result.get("items", []))
+            page_token = events_result.get("nextPageToken")
+            if not page_token:
+                return events, events_result.get("nextSyncToken")
+
+    @staticmethod
+    def _to_event_data(event: dict) -> dict:
+        """Convert a Google Calendar event resource into collected event data."""
+        return {
+            "name": event.get("summary"),
+            "description": event.get("description", ""),
+            "start": convert_iso_timezone(event.get("start", {}).get("dateTime"), timezone.utc),
+            "end": convert_iso_timezone(event.get("end", {}).get("dateTime"), timezone.utc),
+        }
+
+    def get_events(self, start: datetime, end: datetime, state: dict) -> dict:
+        """Retrieve events from the Google calendar within the specified time range.
+
+        ``state`` holds the sync token and events from the previous run; when it covers
+        the range, only events changed since then are downloaded.
+        """
+        if _state_covers(state, start, end):
+            try:
+                events, sync_token = self._list_events(syncToken=state["sync_token"])
+            except HttpError as error:
+                # 410 Gone means the token expired and a full sync is required
+                if error.resp.status != 410:
+                    raise
+            else:
+                snapshot = state["events"]
+                for event in events:
+                    if event.get("status") == "cancelled":
+                        snapshot.pop(event["id"], None)
+                    else:
+                        snapshot[event["id"]] = [self._to_event_data(event)]
+                state["sync_token"] = sync_token
+                return _events_in_window(snapshot, start, end)
+
+        events, sync_token = self._list_events(
             timeMin=start.isoformat(timespec="seconds"),
             timeMax=end.isoformat(timespec="seconds"),
-            singleEvents=True,
-        ).execute()
-        events = events_result.get("items", [])
-        for event in events:
-            name = event.get("summary")
-            desc = event.get("description", "").encode("utf-8").decode("utf-8")
-            start_dt = convert_iso_timezone(event.get("start", {}).get("dateTime"), timezone.utc)
-            end_dt = convert_iso_timezone(event.get("end", {}).get("dateTime"), timezone.utc)
-            events_data[f"{name}/{start_dt}"] = {
-                "name": name,
-                "description": desc,
-                "start": start_dt,
-                "end": end_dt,
-            }
-        return events_data
-
-    def add_event(self, event_data: dict, time_limit: datetime, time_limit_future: datetime):
-        """Add an event to the Google calendar if it falls within the allowed time range."""
-        start_dt = datetime.fromisoformat(event_data["start"])
-        # Skip events outside the defined time range
-        if start_dt < time_limit or start_dt > time_limit_future:
-            print(
-                f"Event '{event_data['name']}' skipped because its start time {start_dt} is out of range."
-            )
-            return
+        )
+        state.clear()
+        state.update(
+            sync_token=sync_token,
+            start=start.isoformat(),
+            end=end.isoformat(),
+            events={
+                event["id"]: [self._to_event_data(event)]
+                for event in events
+                if event.get("status") != "cancelled"
+            },
+        )
+        return _events_in_window(state["events"], start, end)
 
-        event_body = {
+    def _build_event_body(self, event_data: dict) -> dict:
+        """Convert collected event data into a Google Calendar event resource."""
+        return {
             "summary": event_data["name"],
             "description": event_data.get("description", ""),
             "start": {"dateTime": event_data["start"], "timeZone": "UTC"},
             "end": {"dateTime": event_data["end"], "timeZone": "UTC"},
         }
-        self.service.events().insert(
-            calendarId=self.config.google_calname, body=event_body
-        ).execute()
+
+    @staticmethod
+    def _collect_batch_result(pending, retry, errors, request_id, response, exception):
+        """Batch callback sorting failed inserts into retryable and permanent failures."""
+        if exception is None:
+            return
+        failure = (pending[int(request_id)], exception)
+        if _is_transient_google_error(exception):
+            retry.append(failure)
+        else:
+            errors.append(failure)
+
+    def add_events(self, events: list[dict]):
+        """Add events to the Google calendar using batched insert requests.
+
+        Transient failures are retried with exponential backoff; any insert that still
+        fails is logged and the first error is raised once all batches have been sent.
+        """
+        pending = list(events)
+        errors = []
+        for attempt in range(GOOGLE_BATCH_RETRIES + 1):
+            retry = []
+            callback = functools.partial(self._collect_batch_result, pending, retry, errors)
+            for offset in range(0, len(pending), GOOGLE_BATCH_SIZE):
+                batch = self.service.new_batch_http_request(callback=callback)
+                for index in range(offset, min(offset + GOOGLE_BATCH_SIZE, len(pending))):
+                    batch.add(
+                        self.service.events().insert(
+                            calendarId=self.config.google_calname,
+                            body=self._build_event_body(pending[index]),
+                        ),
+                        request_id=str(index),
+                    )
+                batch.execute()
+
+            if not retry:
+                break
+            if attempt < GOOGLE_BATCH_RETRIES:
+                pending = [event_data for event_data, _ in retry]
+                # Exponential backoff before retrying the failed inserts
+                time_module.sleep(2**attempt)
+        else:
+            errors.extend(retry)
+
+        for event_data, exception in errors:
+            logger.error("Failed to add event '%s' to Google: %s", event_data["name"], exception)
+        if errors:
+            raise errors[0][1]
 
 
 # -------------------------------
@@ -189,7 +525,7 @@ class GoogleCalendarClient:
 class CalendarSyncManager:
     def __init__(self, config: Config):
         self.config = config
-        self.utc_tz = pytz.utc
+        self.utc_tz = timezone.utc
         self.yandex_client = YandexCalendarClient(config)
         self.google_client = GoogleCalendarClient(config)
         # Define time limits based on the current date and config settings
@@ -200,43 +536,82 @@ class CalendarSyncManager:
         self.time_limit_future = datetime.combine(
             today + timedelta(days=config.future_days), time.max
         ).replace(tzinfo=self.utc_tz)
+        # Sync tokens and event snapshots saved by the previous run
+        self.sync_state_file = os.path.expanduser(config.sync_state_file)
+        # State is keyed by calendar so switching accounts or calendars never reuses a token
+        self.yandex_state_key = f"yandex/{config.yandex_username}/{config.yandex_calname}"
+        self.google_state_key = f"google/{config.google_calname}"
+        saved_state = _load_sync_state(self.sync_state_file)
+        self.sync_state = {
+            key: saved_state.get(key, {}) for key in (self.yandex_state_key, self.google_state_key)
+        }
 
-    def sync(self):
+    async def _fetch_events(self) -> tuple[dict, dict]:
+        """Retrieve events from both calendars concurrently."""
+        # Both clients block on network I/O, so run them in worker threads
+        return await asyncio.gather(
+            asyncio.to_thread(
+                self.yandex_client.get_events,
+                self.time_limit,
+                self.time_limit_future,
+                self.sync_state[self.yandex_state_key],
+            ),
+            asyncio.to_thread(
+                self.google_client.get_events,
+                self.time_limit,
+                self.time_limit_future,
+                self.sync_state[self.google_state_key],
+            ),
+        )
+
+    async def sync(self):
         """Synchronize events between Yandex and Google calendars."""
         # Retrieve events from both calendars
-        yandex_events = self.yandex_client.get_events(self.time_limit, self.time_limit_future)
-        google_events = self.google_client.get_events(self.time_limit, self.time_limit_future)
+        yandex_events, google_events = await self._fetch_events()
+        _save_sync_state(self.sync_state_file, self.sync_state)
 
-        # Merge events from both calendars (unique key: "name/start_time")
-        all_events = {**yandex_events, **google_events}
+        # Steady state: both calendars already hold the same events
+        if yandex_events.keys() == google_events.keys():
+            logger.info("Calendars are in sync, %d events", len(yandex_events))
+            return
 
-        print(
-            f"Total events: {len(all_events)}, Yandex events: {len(yandex_events)}, Google events: {len(google_events)}"
-        )
+        # Determine events missing in each calendar (unique key: (name, start_time))
+        yandex_missing_keys = google_events.keys() - yandex_events.keys()
+        google_missing_keys = yandex_events.keys() - google_events.keys()
+        # Collection keeps events overlapping the window; only copy those starting inside it
+        google_missing_keys = {
+            event_key
+            for event_key in google_missing_keys
+            if self.time_limit <= _event_start(yandex_events[event_key]) <= self.time_limit_future
+        }
 
-        # Determine events missing in each calendar
-        yandex_missing_keys = set(all_events.keys()) - set(yandex_events.keys())
-        google_missing_keys = set(all_events.keys()) - set(google_events.keys())
+        logger.info(
+            "Total events: %d, Yandex events: %d, Google events: %d",
+            len(yandex_events) + len(yandex_missing_keys),
+            len(yandex_events),
+            len(google_events),
+        )
 
-        print("Missing events in Yandex:", yandex_missing_keys)
-        for event_key in yandex_missing_keys:
-            event_data = all_events[event_key]
-            self.yandex_client.add_event(event_data)
+        logger.info("Missing events in Yandex: %d", len(yandex_missing_keys))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Missing keys in Yandex: %s", _format_event_keys(yandex_missing_keys))
+        self.yandex_client.add_events([google_events[event_key] for event_key in yandex_missing_keys])
 
-        print("Missing events in Google:", google_missing_keys)
-        for event_key in google_missing_keys:
-            event_data = all_events[event_key]
-            self.google_client.add_event(event_data, self.time_limit, self.time_limit_future)
+        logger.info("Missing events in Google: %d", len(google_missing_keys))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Missing keys in Google: %s", _format_event_keys(google_missing_keys))
+        self.google_client.add_events([yandex_events[event_key] for event_key in google_missing_keys])
 
 
 # -------------------------------
 # Main execution
 # -------------------------------
 def main():
+    logging.basicConfig(level=os.getenv("LOGLEVEL", "INFO"))
     # Load configuration from environment variables or the .env file
     config = Config()
     sync_manager = CalendarSyncManager(config)
-    sync_manager.sync()
+    asyncio.run(sync_manager.sync())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+import json
+from types import SimpleNamespace
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+import main
+
+
+def http_error(status, reason=None):
+    errors = [{"reason": reason}] if reason else []
+    content = json.dumps({"error": {"code": status, "message": "error", "errors": errors}})
+    return HttpError(httplib2.Response({"status": status}), content.encode())
+
+
+class FakeBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request, request_id))
+
+    def execute(self):
+        self.service.executed_batches.append([body["summary"] for body, _ in self.requests])
+        for body, request_id in self.requests:
+            outcomes = self.service.outcomes.get(body["summary"], [None])
+            # The last outcome repeats for every further attempt
+            outcome = outcomes.pop(0) if len(outcomes) > 1 else outcomes[0]
+            self.callback(request_id, None if outcome else body, outcome)
+
+
+class FakeGoogleService:
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.executed_batches = []
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+    def events(self):
+        return self
+
+    def insert(self, calendarId, body):
+        return body
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    calls = []
+    monkeypatch.setattr(main.time_module, "sleep", calls.append)
+    return calls
+
+
+def make_client(outcomes):
+    client = main.GoogleCalendarClient.__new__(main.GoogleCalendarClient)
+    client.config = SimpleNamespace(google_calname="primary")
+    client.service = FakeGoogleService(outcomes)
+    return client
+
+
+def make_events(*names):
+    return [
+        {"name": name, "start": "2026-10-05T09:00:00+00:00", "end": "2026-10-05T10:00:00+00:00"}
+        for name in names
+    ]
+
+
+@pytest.mark.parametrize(
+    "exception, transient",
+    [
+        (http_error(429), True),
+        (http_error(500), True),
+        (http_error(503), True),
+        (http_error(403, "rateLimitExceeded"), True),
+        (http_error(403, "userRateLimitExceeded"), True),
+        (http_error(403, "forbidden"), False),
+        (http_error(400), False),
+        (http_error(404), False),
+        (ValueError("not an HTTP error"), False),
+    ],
+)
+def test_is_transient_google_error(exception, transient):
+    assert main._is_transient_google_error(exception) is transient
+
+
+def test_add_events_retries_429_until_it_succeeds(sleeps):
+    client = make_client({"A": [http_error(429), None]})
+
+    client.add_events(make_events("A", "B"))
+
+    assert client.service.executed_batches == [["A", "B"], ["A"]]
+    assert sleeps == [1]
+
+
+def test_add_events_retries_rate_limit_but_not_forbidden(sleeps):
+    client = make_client(
+        {
+            "limited": [http_error(403, "rateLimitExceeded"), None],
+            "forbidden": [http_error(403, "forbidden")],
+        }
+    )
+
+    with pytest.raises(HttpError) as raised:
+        client.add_events(make_events("limited", "forbidden"))
+
+    assert client.service.executed_batches == [["limited", "forbidden"], ["limited"]]
+    assert raised.value.resp.status == 403
+    assert sleeps == [1]
+
+
+def test_add_events_raises_permanent_failure_after_all_batches(sleeps):
+    names = [f"event-{index}" for index in range(main.GOOGLE_BATCH_SIZE + 1)]
+    client = make_client({"event-0": [http_error(400)]})
+
+    with pytest.raises(HttpError) as raised:
+        client.add_events(make_events(*names))
+
+    assert client.service.executed_batches == [names[: main.GOOGLE_BATCH_SIZE], names[main.GOOGLE_BATCH_SIZE :]]
+    assert raised.value.resp.status == 400
+    assert sleeps == []
+
+
+def test_add_events_backs_off_exponentially_then_raises(sleeps):
+    client = make_client({"A": [http_error(503)]})
+
+    with pytest.raises(HttpError) as raised:
+        client.add_events(make_events("A"))
+
+    assert sleeps == [1, 2, 4]
+    assert len(client.service.executed_batches) == main.GOOGLE_BATCH_RETRIES + 1
+    assert raised.value.resp.status == 503
@@ -0,0 +1,321 @@
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+import main
+
+START = datetime(2026, 10, 1, tzinfo=timezone.utc)
+END = datetime(2026, 10, 31, tzinfo=timezone.utc)
+
+
+def make_event(name, start, end, **extra):
+    return {"name": name, "description": "", "start": start, "end": end, **extra}
+
+
+def make_state(events, sync_token="token-1", start=START, end=END):
+    return {
+        "sync_token": sync_token,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "events": events,
+    }
+
+
+# -------------------------------
+# State file
+# -------------------------------
+def test_save_sync_state_drops_private_fields(tmp_path):
+    path = tmp_path / "state" / "tokens.json"
+    event = make_event(
+        "Standup",
+        "2026-10-05T09:00:00+00:00",
+        "2026-10-05T09:15:00+00:00",
+        _start_dt=datetime(2026, 10, 5, 9, tzinfo=timezone.utc),
+    )
+    main._save_sync_state(str(path), {"google/primary": make_state({"id-1": [event]})})
+
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved["google/primary"]["events"]["id-1"] == [
+        make_event("Standup", "2026-10-05T09:00:00+00:00", "2026-10-05T09:15:00+00:00")
+    ]
+    assert saved["google/primary"]["sync_token"] == "token-1"
+
+
+def test_save_sync_state_logs_unwritable_path(tmp_path, caplog):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("", encoding="utf-8")
+
+    main._save_sync_state(str(blocker / "tokens.json"), {})
+
+    assert "Could not write sync state" in caplog.text
+
+
+def test_load_sync_state_reads_file_from_previous_run(tmp_path):
+    path = tmp_path / "tokens.json"
+    state = {"google/primary": make_state({"id-1": [make_event("A", "x", "y")]})}
+    path.write_text(json.dumps(state), encoding="utf-8")
+
+    assert main._load_sync_state(str(path)) == state
+
+
+@pytest.mark.parametrize("content", [None, "{not json"])
+def test_load_sync_state_missing_or_corrupt(tmp_path, content):
+    path = tmp_path / "tokens.json"
+    if content is not None:
+        path.write_text(content, encoding="utf-8")
+
+    assert main._load_sync_state(str(path)) == {}
+
+
+# -------------------------------
+# Window handling
+# -------------------------------
+def test_state_covers():
+    assert main._state_covers(make_state({}), START, END)
+    assert not main._state_covers(make_state({}, sync_token=None), START, END)
+    assert not main._state_covers({}, START, END)
+    # The window moved past the stored one
+    later_end = END.replace(day=31, month=12)
+    assert not main._state_covers(make_state({}), START, later_end)
+
+
+def test_events_in_window_keeps_overlapping_events():
+    snapshot = {
+        "inside": [make_event("Inside", "2026-10-05T09:00:00+00:00", "2026-10-05T10:00:00+00:00")],
+        "overlap": [make_event("Overlap", "2026-09-30T22:00:00+00:00", "2026-10-01T02:00:00+00:00")],
+        "before": [make_event("Before", "2026-09-01T09:00:00+00:00", "2026-09-01T10:00:00+00:00")],
+        "after": [make_event("After", "2026-11-05T09:00:00+00:00", "2026-11-05T10:00:00+00:00")],
+        "all-day": [make_event("All day", None, None)],
+    }
+
+    events = main._events_in_window(snapshot, START, END)
+
+    assert set(events) == {
+        ("Inside", "2026-10-05T09:00:00+00:00"),
+        ("Overlap", "2026-09-30T22:00:00+00:00"),
+        ("All day", None),
+    }
+
+
+# -------------------------------
+# Google incremental sync
+# -------------------------------
+class FakeGoogleService:
+    def __init__(self, pages, expired_token=False):
+        self.pages = list(pages)
+        self.expired_token = expired_token
+        self.calls = []
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        self.calls.append(params)
+        if "syncToken" in params and self.expired_token:
+            raise HttpError(httplib2.Response({"status": 410}), b"")
+        return SimpleNamespace(execute=lambda: self.pages.pop(0))
+
+
+def google_item(event_id, name, status="confirmed"):
+    return {
+        "id": event_id,
+        "status": status,
+        "summary": name,
+        "start": {"dateTime": "2026-10-05T09:00:00+00:00"},
+        "end": {"dateTime": "2026-10-05T10:00:00+00:00"},
+    }
+
+
+def make_google_client(service, monkeypatch):
+    monkeypatch.setattr(main, "convert_iso_timezone", lambda value, tz: value)
+    client = main.GoogleCalendarClient.__new__(main.GoogleCalendarClient)
+    client.config = SimpleNamespace(google_calname="primary")
+    client.service = service
+    return client
+
+
+def test_google_full_fetch_stores_token_and_snapshot(monkeypatch):
+    service = FakeGoogleService(
+        [
+            {"items": [google_item("1", "A")], "nextPageToken": "page-2"},
+            {"items": [google_item("2", "B", status="cancelled")], "nextSyncToken": "token-1"},
+        ]
+    )
+    client = make_google_client(service, monkeypatch)
+    state = {}
+
+    events = client.get_events(START, END, state)
+
+    assert set(events) == {("A", "2026-10-05T09:00:00+00:00")}
+    assert state["sync_token"] == "token-1"
+    assert set(state["events"]) == {"1"}
+    assert service.calls[1]["pageToken"] == "page-2"
+
+
+def test_google_incremental_applies_changes_and_cancellations(monkeypatch):
+    service = FakeGoogleService(
+        [{"items": [google_item("1", "A", status="cancelled"), google_item("3", "C")], "nextSyncToken": "token-2"}]
+    )
+    client = make_google_client(service, monkeypatch)
+    state = make_state(
+        {
+            "1": [make_event("A", "2026-10-05T09:00:00+00:00", "2026-10-05T10:00:00+00:00")],
+            "2": [make_event("B", "2026-10-06T09:00:00+00:00", "2026-10-06T10:00:00+00:00")],
+        }
+    )
+
+    events = client.get_events(START, END, state)
+
+    assert service.calls[0]["syncToken"] == "token-1"
+    assert "timeMin" not in service.calls[0]
+    assert set(events) == {("B", "2026-10-06T09:00:00+00:00"), ("C", "2026-10-05T09:00:00+00:00")}
+    assert set(state["events"]) == {"2", "3"}
+    assert state["sync_token"] == "token-2"
+
+
+def test_google_expired_token_falls_back_to_full_fetch(monkeypatch):
+    service = FakeGoogleService([{"items": [google_item("3", "C")], "nextSyncToken": "token-2"}], expired_token=True)
+    client = make_google_client(service, monkeypatch)
+    state = make_state({"1": [make_event("A", "2026-10-05T09:00:00+00:00", "2026-10-05T10:00:00+00:00")]})
+
+    events = client.get_events(START, END, state)
+
+    assert "timeMin" in service.calls[1]
+    assert set(events) == {("C", "2026-10-05T09:00:00+00:00")}
+    assert set(state["events"]) == {"3"}
+    assert state["sync_token"] == "token-2"
+
+
+# -------------------------------
+# Yandex incremental sync
+# -------------------------------
+ICS_TEMPLATE = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "BEGIN:VEVENT\r\n"
+    "UID:{uid}\r\n"
+    "SUMMARY:{name}\r\n"
+    "DTSTART:20261007T090000Z\r\n"
+    "DTEND:20261007T100000Z\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+class FakeChanges(list):
+    def __init__(self, objects, sync_token):
+        super().__init__(objects)
+        self.sync_token = sync_token
+
+
+class FakeCalendar:
+    """CalDAV collection modelled on caldav's sync-token behaviour."""
+
+    def __init__(self, objects):
+        self.objects = dict(objects)
+        self.history = []
+        self.first_valid_token = 0
+        self.search_calls = []
+        self.sync_calls = []
+
+    @property
+    def token(self):
+        return f"token-{len(self.history)}"
+
+    def put(self, url, ics_data):
+        self.objects[url] = ics_data
+        self.history.append(url)
+
+    def delete(self, url):
+        del self.objects[url]
+        self.history.append(url)
+
+    def expire_tokens(self):
+        self.first_valid_token = len(self.history) + 1
+
+    def get_property(self, prop):
+        assert isinstance(prop, main.dav.SyncToken)
+        return self.token
+
+    def search(self, start=None, end=None, **searchargs):
+        self.search_calls.append((start, end))
+        return [SimpleNamespace(url=url, data=data) for url, data in self.objects.items()]
+
+    def get_objects_by_sync_token(self, sync_token, load_objects, disable_fallback=False):
+        self.sync_calls.append(sync_token)
+        position = int(sync_token.removeprefix("token-")) if sync_token.startswith("token-") else -1
+        if position < self.first_valid_token or position > len(self.history):
+            if disable_fallback:
+                raise main.DAVError("invalid sync-token")
+            # caldav silently downloads the whole collection and invents a token
+            return FakeChanges(self.search(), "fake-1234")
+        # Deleted objects fail to load and keep data=None
+        changed = dict.fromkeys(self.history[position:])
+        objects = [SimpleNamespace(url=url, data=self.objects.get(url)) for url in changed]
+        return FakeChanges(objects, self.token)
+
+
+def make_yandex_client(calendar):
+    client = main.YandexCalendarClient.__new__(main.YandexCalendarClient)
+    client.calendar = calendar
+    return client
+
+
+def yandex_object(uid, name):
+    return f"https://caldav.example/{uid}.ics", ICS_TEMPLATE.format(uid=uid, name=name)
+
+
+def test_yandex_full_then_incremental_drops_deleted_event():
+    calendar = FakeCalendar([yandex_object("1", "A"), yandex_object("2", "B")])
+    client = make_yandex_client(calendar)
+    state = {}
+
+    events = client.get_events(START, END, state)
+    assert set(events) == {("A", "2026-10-07T09:00:00+00:00"), ("B", "2026-10-07T09:00:00+00:00")}
+    assert calendar.search_calls == [(START, END)]
+    assert state["sync_token"] == "token-0"
+
+    calendar.delete("https://caldav.example/1.ics")
+    calendar.put(*yandex_object("2", "B2"))
+    events = client.get_events(START, END, state)
+
+    assert calendar.sync_calls == ["token-0"]
+    assert len(calendar.search_calls) == 1
+    assert set(events) == {("B2", "2026-10-07T09:00:00+00:00")}
+    assert set(state["events"]) == {"https://caldav.example/2.ics"}
+    assert state["sync_token"] == "token-2"
+
+
+def test_yandex_rejected_token_falls_back_to_windowed_search():
+    calendar = FakeCalendar([yandex_object("2", "B")])
+    client = make_yandex_client(calendar)
+    state = make_state(
+        {"https://caldav.example/1.ics": [make_event("A", "2026-10-05T09:00:00+00:00", "2026-10-05T10:00:00+00:00")]},
+        sync_token="token-0",
+    )
+    calendar.expire_tokens()
+
+    events = client.get_events(START, END, state)
+
+    assert calendar.sync_calls == ["token-0"]
+    assert calendar.search_calls == [(START, END)]
+    assert set(events) == {("B", "2026-10-07T09:00:00+00:00")}
+    assert set(state["events"]) == {"https://caldav.example/2.ics"}
+    assert state["sync_token"] == "token-0"
+
+
+def test_yandex_emulated_token_is_not_reused():
+    calendar = FakeCalendar([yandex_object("2", "B")])
+    client = make_yandex_client(calendar)
+    state = make_state({}, sync_token="fake-1234")
+
+    events = client.get_events(START, END, state)
+
+    assert calendar.sync_calls == []
+    assert calendar.search_calls == [(START, END)]
+    assert set(events) == {("B", "2026-10-07T09:00:00+00:00")}
+    assert state["sync_token"] == "token-0"